@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .hypergraph import Hypergraph
+
+# Below this many masks a plain tuple comprehension beats the cost of
+# building a numpy array; above it the vectorized filter wins.
+_VECTOR_THRESHOLD = 64
+
+
+def _filter_masks(masks: tuple, bit: int) -> tuple:
+    """
+    Returns the masks that do not contain `bit`.
+
+    For large containers whose masks fit in a signed 64-bit word the
+    filter runs as a single vectorized numpy pass; small containers (the
+    common case) use a tuple comprehension.
+    """
+    if (
+        len(masks) >= _VECTOR_THRESHOLD
+        and bit < (1 << 63)
+        and masks[-1] < (1 << 63)  # masks are sorted, so this is the max
+    ):
+        arr = np.fromiter(masks, dtype=np.int64, count=len(masks))
+        return tuple(int(m) for m in arr[(arr & bit) == 0])
+    return tuple(m for m in masks if not m & bit)
+
+
+def _children_fields(V: int, E: tuple, F: tuple) -> list:
+    """
+    Returns the (V, E, F) field tuples of every child state reachable by
+    one vertex removal. This is the shared expansion routine behind both
+    BitHypergraph.children() and the Grundy kernel's expand pass.
+
+    For wide states (many vertices and many edges/faces within 64 bits)
+    the incident-mask tests for all children are evaluated as a single
+    broadcast numpy comparison instead of one Python filter pass per
+    child; narrow states take a scalar loop that shares the parent's
+    tuples for containers a removal leaves untouched.
+    """
+    bits = []
+    mask = V
+    while mask:
+        low_bit = mask & -mask
+        bits.append(low_bit)
+        mask ^= low_bit
+    masks = E + F
+    n_edges = len(E)
+    children = []
+    if len(bits) >= 8 and len(masks) >= _VECTOR_THRESHOLD and V < (1 << 63):
+        mask_arr = np.fromiter(masks, dtype=np.int64, count=len(masks))
+        bit_arr = np.asarray(bits, dtype=np.int64)
+        # keep[c, m] is True when child c retains mask m
+        keep = (mask_arr[None, :] & bit_arr[:, None]) == 0
+        edge_arr, face_arr = mask_arr[:n_edges], mask_arr[n_edges:]
+        for bit, keep_row in zip(bits, keep):
+            kept_edges = tuple(int(m) for m in edge_arr[keep_row[:n_edges]])
+            kept_faces = tuple(int(m) for m in face_arr[keep_row[n_edges:]])
+            children.append((V & ~bit, kept_edges, kept_faces))
+        return children
+    for bit in bits:
+        child_E = E
+        if any(e & bit for e in child_E):
+            child_E = _filter_masks(child_E, bit)
+        child_F = F
+        if any(f & bit for f in child_F):
+            child_F = _filter_masks(child_F, bit)
+        children.append((V & ~bit, child_E, child_F))
+    return children
+
+
+@dataclass(frozen=True, slots=True)
+class BitHypergraph:
+    """
+    Immutable bitmask encoding of a hypergraph state.
+
+    Each vertex label is assigned a bit index at construction. V is the
+    bitmask of the vertices still present, and E/F are sorted tuples of
+    edge/face bitmasks. With this layout the hot operations of the Grundy
+    search become single integer instructions: removing vertex i is
+    `V & ~(1 << i)` and filtering out the incident edges is `e & bit`.
+    Hashing is just `hash((V, E, F))` — no canonical sorting is needed
+    because the tuples are kept sorted.
+    """
+
+    V: int
+    E: tuple[int, ...]
+    F: tuple[int, ...]
+
+    @classmethod
+    def from_hypergraph(cls, hypergraph: Hypergraph) -> "BitHypergraph":
+        """
+        Encodes a Hypergraph as a BitHypergraph.
+
+        Vertex labels are assigned bit indices in sorted order, so two
+        equal Hypergraphs always encode to the same BitHypergraph.
+
+        Args:
+            hypergraph: The Hypergraph to encode.
+
+        Returns:
+            The bitmask encoding of the hypergraph.
+        """
+        labels = sorted(hypergraph.vertices)
+        bit_of = {label: 1 << i for i, label in enumerate(labels)}
+
+        vertex_mask = 0
+        for label in labels:
+            vertex_mask |= bit_of[label]
+
+        def mask_of(vertex_set):
+            mask = 0
+            for label in vertex_set:
+                mask |= bit_of[label]
+            return mask
+
+        edges = tuple(sorted(mask_of(edge) for edge in hypergraph.edges))
+        faces = tuple(sorted(mask_of(face) for face in hypergraph.faces))
+        return cls(vertex_mask, edges, faces)
+
+    def remove_vertex(self, bit_index: int) -> "BitHypergraph":
+        """
+        Returns a new BitHypergraph with the given vertex removed, along
+        with every edge and face that contained it (same cascade as
+        Hypergraph.remove_vertex).
+        """
+        bit = 1 << bit_index
+        # Share the parent's tuples when the vertex is not incident to any
+        # of their elements; only a touched container is rebuilt.
+        edges = self.E
+        if any(e & bit for e in edges):
+            edges = _filter_masks(edges, bit)
+        faces = self.F
+        if any(f & bit for f in faces):
+            faces = _filter_masks(faces, bit)
+        return BitHypergraph(self.V & ~bit, edges, faces)
+
+    def children(self) -> list["BitHypergraph"]:
+        """
+        Returns the child states reachable by one vertex removal, one per
+        live vertex. Expansion (including the batched numpy path for
+        wide states) is shared with the Grundy kernel via
+        _children_fields.
+        """
+        return [
+            BitHypergraph(*fields)
+            for fields in _children_fields(self.V, self.E, self.F)
+        ]
+
+    def vertex_bits(self):
+        """
+        Yields the bit index of every vertex still present in the state.
+        """
+        mask = self.V
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def pack(self) -> bytes:
+        """
+        Packs the state into a compact bytes key.
+
+        The encoding is injective (field width, vertex mask, edge count,
+        then the edge and face masks), so equal states pack identically
+        and distinct states never collide. bytes keys hash faster than
+        nested tuples and make small memo entries.
+        """
+        width = max((self.V.bit_length() + 7) // 8, 1)
+        parts = [
+            width.to_bytes(1, "little"),
+            self.V.to_bytes(width, "little"),
+            len(self.E).to_bytes(2, "little"),
+        ]
+        parts += [edge.to_bytes(width, "little") for edge in self.E]
+        parts += [face.to_bytes(width, "little") for face in self.F]
+        return b"".join(parts)
+
+    def is_empty(self) -> bool:
+        return self.V == 0
+
+    def vertex_count(self) -> int:
+        return self.V.bit_count()
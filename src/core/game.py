@@ -1,6 +1,5 @@
-import copy
 from .hypergraph import Hypergraph
-from .utils import calculate_grundy
+from .utils import calculate_grundy, is_losing
 
 
 class TakeAwayGame:
@@ -15,7 +14,7 @@ class TakeAwayGame:
     def current_player(self):
         return self.players[self.current_player_index]
 
-    # Ensures the vertex exists, Saves current state to history (for undo)
+    # Ensures the vertex exists, records the removal delta (for undo)
     # Calls hypergraph.remove_vertex() — which removes: The vertex,
     # all incident edges and faces
     # Checks for win condition
@@ -24,24 +23,32 @@ class TakeAwayGame:
         if vertex not in self.hypergraph.vertices:
             raise ValueError(f"Vertex {vertex} not found in hypergraph")  # noqa: E713
 
-        self.history.append(copy.deepcopy(self.hypergraph))
-        self.hypergraph.remove_vertex(vertex)
-        # self.history.append((self.current_player, f"remove vertex {vertex}"))
+        # Push only the delta (vertex plus the edges/faces that contained it)
+        # instead of deep-copying the whole hypergraph; undo reconstructs
+        # the state in O(incident) time.
+        removed_edges, removed_faces = self.hypergraph.remove_vertex(vertex)
+        self.history.append((vertex, removed_edges, removed_faces))
 
         if not self.hypergraph.vertices:
             self.winner = self.current_player
         self._next_player()
 
     def move_hyperedge(self, h):
-        self.hypergraph.remove_hyperedge(set(h))
-        self.history.append((self.current_player, f"remove hyperedge {h}"))
+        removed_edges, removed_faces = self.hypergraph.remove_hyperedge(set(h))
+        # Record the same kind of delta as move_vertex (vertex slot None)
+        # so undo can replay hyperedge moves too.
+        self.history.append((None, removed_edges, removed_faces))
         self._next_player()
 
     # Restores previous hypergraph state and reverts turn to previous player.
     def undo(self):
         if not self.history:
             return
-        self.hypergraph = self.history.pop()
+        vertex, removed_edges, removed_faces = self.history.pop()
+        if vertex is None:  # hyperedge move: no vertex to restore
+            self.hypergraph._restore_elements(removed_edges, removed_faces)
+        else:
+            self.hypergraph._restore_vertex(vertex, removed_edges, removed_faces)
         self._next_player()
 
     # Returns True if no vertices remain.
@@ -69,16 +76,17 @@ class TakeAwayGame:
     def is_losing_position(self) -> bool:
         """
         Checks if the current hypergraph state is a P-position (losing position for the current player).
-        A P-position has a Grundy number of 0.
+        A P-position has a Grundy number of 0. Uses the boolean winnability
+        fast path rather than computing the full Grundy number.
         """
-        return self.get_current_grundy_number() == 0
+        return is_losing(self.hypergraph)
 
     def is_winning_position(self) -> bool:
         """
         Checks if the current hypergraph state is an N-position (winning position for the current player).
         An N-position has a Grundy number greater than 0.
         """
-        return self.get_current_grundy_number() > 0
+        return not is_losing(self.hypergraph)
 
 
 if __name__ == "__main__":
@@ -1,51 +1,310 @@
 import collections
+import functools
+import hashlib
+import itertools
+import math
+import sys
+
+# Free list for transient Hypergraph instances (see acquire/release).
+# Capped so a burst of releases cannot pin arbitrary memory.
+_POOL: list = []
+_POOL_LIMIT = 256
+
+# Cap on the number of orderings canonical_form() may try. The search
+# space is the product of the color-class-size factorials, and highly
+# symmetric states (cycles, complete graphs, one large face) collapse to
+# a single class, making it |V|!. Past the cap the exact sorted-label
+# encoding is used instead: still a sound memo key, it just stops
+# collapsing relabeled states onto one entry. 7! keeps the worst case at
+# a few thousand encodings.
+_CANONICAL_SEARCH_LIMIT = 5040
+
+# Zobrist tag tables: every vertex label and every edge/face frozenset
+# gets a fixed 64-bit tag, and a state's hash is the XOR of the tags of
+# its members. Mutators update the hash incrementally in O(delta)
+# instead of rescanning the whole state. Tags are derived from a stable
+# digest of the label (not random.getrandbits) so instances pickled to
+# worker processes keep hashing consistently there.
+_VERTEX_TAGS: dict = {}
+_EDGE_TAGS: dict = {}
+_FACE_TAGS: dict = {}
+
+
+def _label_digest(label) -> bytes:
+    return hashlib.blake2b(repr(label).encode(), digest_size=8).digest()
+
+
+def _vertex_tag(vertex) -> int:
+    tag = _VERTEX_TAGS.get(vertex)
+    if tag is None:
+        digest = hashlib.blake2b(b"v:" + _label_digest(vertex), digest_size=8).digest()
+        tag = int.from_bytes(digest, "big")
+        _VERTEX_TAGS[vertex] = tag
+    return tag
+
+
+def _element_tag(table: dict, prefix: bytes, element: frozenset) -> int:
+    tag = table.get(element)
+    if tag is None:
+        # Sort the member digests (not the labels, which may not be
+        # mutually comparable) for an order-independent fingerprint.
+        parts = sorted(_label_digest(v) for v in element)
+        digest = hashlib.blake2b(prefix + b"".join(parts), digest_size=8).digest()
+        tag = int.from_bytes(digest, "big")
+        table[element] = tag
+    return tag
+
+
+def _edge_tag(edge: frozenset) -> int:
+    return _element_tag(_EDGE_TAGS, b"e:", edge)
+
+
+def _face_tag(face: frozenset) -> int:
+    return _element_tag(_FACE_TAGS, b"f:", face)
 
 
 class Hypergraph:
+    # Grundy search creates a lot of instances; __slots__ drops the
+    # per-instance __dict__ and makes attribute access an array index.
+    __slots__ = (
+        "vertices",
+        "edges",
+        "faces",
+        "_hash",
+        "_str_cache",
+        "_canon_cache",
+        "_incidence",
+    )
+
     def __init__(self):
         self.vertices = set()
         self.edges = set()  # edges of size 2
         self.faces = set()  # hyperedges of size > 2
+        # Incremental Zobrist hash: XOR of the member tags, kept current
+        # by every mutator, so __hash__ is a plain attribute read.
+        self._hash = 0
+        # Memoized str() form; mutators reset it to None. Game-tree
+        # nodes stringify every state, so repeated renders are O(1).
+        self._str_cache = None
+        # Memoized packed canonical key (see canonical_key()); mutators
+        # reset it to None alongside the str cache.
+        self._canon_cache = None
+        # vertex -> (incident edges, incident faces). Lets remove_vertex
+        # touch only the incident elements (O(degree)) instead of scanning
+        # every edge and face on each move.
+        self._incidence = {}
+
+    @classmethod
+    def acquire(cls) -> "Hypergraph":
+        """
+        Returns an empty instance, reusing one from the free list when
+        available. Reuse keeps the already-allocated backing containers
+        alive instead of paying allocator churn per transient state.
+        """
+        if _POOL:
+            return _POOL.pop()
+        return cls()
+
+    @classmethod
+    def release(cls, hypergraph: "Hypergraph") -> None:
+        """
+        Clears an instance and returns it to the free list.
+
+        Only safe when nothing else retains the instance (the memos store
+        ints keyed on bytes/tuples, never Hypergraphs, so the transient
+        states of the Grundy recursion qualify).
+        """
+        hypergraph.vertices.clear()
+        hypergraph.edges.clear()
+        hypergraph.faces.clear()
+        hypergraph._incidence.clear()
+        hypergraph._hash = 0
+        hypergraph._str_cache = None
+        hypergraph._canon_cache = None
+        if len(_POOL) < _POOL_LIMIT:
+            _POOL.append(hypergraph)
+
+    def _incidence_entry(self, vertex):
+        entry = self._incidence.get(vertex)
+        if entry is None:
+            entry = (set(), set())
+            self._incidence[vertex] = entry
+        return entry
+
+    def degree(self, vertex) -> int:
+        """
+        Returns the number of edges and faces incident to a vertex,
+        answered in O(1) from the incidence index.
+        """
+        entry = self._incidence.get(vertex)
+        if entry is None:
+            return 0
+        return len(entry[0]) + len(entry[1])
 
     def __str__(self) -> str:
-        return f"V: {self.vertices} | E: {self.edges} | F: {self.faces}"
+        if self._str_cache is None:
+            self._str_cache = f"V: {self.vertices} | E: {self.edges} | F: {self.faces}"
+        return self._str_cache
 
     def add_vertex(self, vertex):
-        self.vertices.add(vertex)
+        # Intern string labels so every later hash/equality check on them
+        # is a pointer comparison first.
+        if isinstance(vertex, str):
+            vertex = sys.intern(vertex)
+        if vertex not in self.vertices:
+            self.vertices.add(vertex)
+            self._hash ^= _vertex_tag(vertex)
+            self._str_cache = None
+            self._canon_cache = None
 
     def add_edge(self, vertex_set: set):
         if len(vertex_set) != 2:
             raise ValueError("Edge must connect exactly two vertices.")
         if not all(vertex in self.vertices for vertex in vertex_set):
             raise ValueError("All vertices in an edge must exist in the hypergraph.")
-        self.edges.add(frozenset(vertex_set))
+        edge = frozenset(vertex_set)
+        if edge in self.edges:
+            return
+        self.edges.add(edge)
+        for vertex in edge:
+            self._incidence_entry(vertex)[0].add(edge)
+        self._hash ^= _edge_tag(edge)
+        self._str_cache = None
+        self._canon_cache = None
 
     def add_face(self, face):
         if not all(vertex in self.vertices for vertex in face):
             raise ValueError("All vertices in a face must exist in the hypergraph.")
-        self.faces.add(frozenset(face))
+        face = frozenset(face)
+        if face in self.faces:
+            return
+        self.faces.add(face)
+        for vertex in face:
+            self._incidence_entry(vertex)[1].add(face)
+        self._hash ^= _face_tag(face)
+        self._str_cache = None
+        self._canon_cache = None
 
     def remove_vertex(self, vertex):
+        """
+        Removes a vertex and every edge/face that contains it.
+
+        Returns the removal delta as a tuple (removed_edges, removed_faces)
+        so callers can undo the move with _restore_vertex() instead of
+        snapshotting the whole hypergraph.
+        """
         if vertex not in self.vertices:
-            return
+            return set(), set()
 
         self.vertices.remove(vertex)
-        # Remove all edges and faces that contain vertex
-        self.edges = {edge for edge in self.edges if vertex not in edge}
-        self.faces = {face for face in self.faces if vertex not in face}
+        # The incidence index gives the doomed elements directly, so only
+        # the incident edges/faces are touched (O(degree(vertex))) instead
+        # of scanning every edge and face on each move.
+        entry = self._incidence.pop(vertex, None)
+        removed_edges, removed_faces = entry if entry is not None else (set(), set())
+        # Detach the doomed elements from the other vertices' entries.
+        for edge in removed_edges:
+            for other in edge:
+                if other != vertex and other in self._incidence:
+                    self._incidence[other][0].discard(edge)
+        for face in removed_faces:
+            for other in face:
+                if other != vertex and other in self._incidence:
+                    self._incidence[other][1].discard(face)
+        self.edges -= removed_edges
+        self.faces -= removed_faces
+        self._hash ^= _vertex_tag(vertex)
+        for edge in removed_edges:
+            self._hash ^= _edge_tag(edge)
+        for face in removed_faces:
+            self._hash ^= _face_tag(face)
+        self._str_cache = None
+        self._canon_cache = None
+        return removed_edges, removed_faces
+
+    def _restore_vertex(self, vertex, edges, faces):
+        """
+        Reverses a remove_vertex() call using the delta it returned.
+        Restores the vertex and re-adds the edges/faces that were dropped.
+        """
+        self.vertices.add(vertex)
+        self._hash ^= _vertex_tag(vertex)
+        self._str_cache = None
+        self._canon_cache = None
+        self._restore_elements(edges, faces)
+
+    def _restore_elements(self, edges, faces):
+        """
+        Re-adds previously removed edges/faces and re-attaches them in the
+        incidence index (undo helper shared by vertex and hyperedge moves).
+        """
+        self.edges |= edges
+        self.faces |= faces
+        for edge in edges:
+            for other in edge:
+                self._incidence_entry(other)[0].add(edge)
+        for face in faces:
+            for other in face:
+                self._incidence_entry(other)[1].add(face)
+        for edge in edges:
+            self._hash ^= _edge_tag(edge)
+        for face in faces:
+            self._hash ^= _face_tag(face)
+        self._str_cache = None
+        self._canon_cache = None
 
     def remove_edge(self, edge: set):
+        edge = frozenset(edge)
         if edge in self.edges:
-            self.edges.discard(frozenset(edge))
+            self.edges.discard(edge)
+            self._detach_edge(edge)
+            self._hash ^= _edge_tag(edge)
+            self._str_cache = None
+            self._canon_cache = None
 
     def remove_hyperedge(self, h_set: set):
-        self.faces = {face for face in self.faces if not h_set.issubset(face)}
+        """
+        Removes every face that contains h_set (and the matching edge when
+        h_set has size 2). Returns the (removed_edges, removed_faces)
+        delta, mirroring remove_vertex, so the move can be undone.
+        """
+        doomed_faces = {face for face in self.faces if h_set.issubset(face)}
+        self.faces -= doomed_faces
+        for face in doomed_faces:
+            self._detach_face(face)
+            self._hash ^= _face_tag(face)
+        doomed_edges = set()
         if len(h_set) == 2:
-            self.edges.discard(frozenset(h_set))
+            edge = frozenset(h_set)
+            if edge in self.edges:
+                self.edges.discard(edge)
+                self._detach_edge(edge)
+                self._hash ^= _edge_tag(edge)
+                doomed_edges.add(edge)
+        self._str_cache = None
+        self._canon_cache = None
+        return doomed_edges, doomed_faces
 
     def remove_face(self, face: set):
+        face = frozenset(face)
         if face in self.faces:
-            self.faces.discard(frozenset(face))
+            self.faces.discard(face)
+            self._detach_face(face)
+            self._hash ^= _face_tag(face)
+            self._str_cache = None
+            self._canon_cache = None
+
+    def _detach_edge(self, edge):
+        for vertex in edge:
+            entry = self._incidence.get(vertex)
+            if entry is not None:
+                entry[0].discard(edge)
+
+    def _detach_face(self, face):
+        for vertex in face:
+            entry = self._incidence.get(vertex)
+            if entry is not None:
+                entry[1].discard(face)
 
     def is_empty(self):
         return len(self.vertices) == 0
@@ -70,27 +329,33 @@ class Hypergraph:
             and self.faces == other.faces
         )
 
+    def state_key(self) -> tuple:
+        """
+        Returns an exact-state key: equal keys mean equal states (same
+        labels, same elements). Unlike the canonical form, which
+        identifies isomorphic relabelings, and unlike hash(), which can
+        collide, comparing these tuples falls back on full equality —
+        safe for visited-set bookkeeping where two distinct sibling
+        states must never be confused.
+        """
+        return (
+            frozenset(self.vertices),
+            frozenset(self.edges),
+            frozenset(self.faces),
+        )
+
     # Two Hypergraph objects will have the same hash
     # # if their structure (vertices, edges, faces)
     # is identical, regardless of the internal order
     # of elements in the Python sets, making them suitable for
     # use as dictionary keys or set members
     def __hash__(self):
-        # Create a canonical representation for hashing
-        # qwe sort vertices for consistent order
-        canonical_vertices = frozenset(sorted(list(self.vertices)))
-        # sort frozenset edges (each frozenset is already hashable)
-        # The key ensures consistent ordering
-        # of frozensets in the outer frozenset
-        canonical_edges = frozenset(
-            sorted(list(self.edges), key=lambda x: tuple(sorted(x)))
-        )
-        # and , sort frozenset faces
-        canonical_faces = frozenset(
-            sorted(list(self.faces), key=lambda x: tuple(sorted(x)))
-        )
-
-        return hash((canonical_vertices, canonical_edges, canonical_faces))
+        # The Zobrist XOR is maintained incrementally by every mutator,
+        # so hashing never rescans the state: equal states are built
+        # from identical tags and therefore share the hash regardless of
+        # insertion order; __eq__ stays structural, so the rare tag
+        # collision only costs an equality check, never correctness.
+        return self._hash
 
     def copy(self) -> "Hypergraph":
         """
@@ -106,70 +371,228 @@ class Hypergraph:
         )  # set.copy() creates a shallow copy of the set, but frozensets are immutable
         # Add faces
         new_hg.faces = self.faces.copy()
+        # Copy the incidence index (the inner sets must be duplicated so
+        # the copy can be mutated independently)
+        new_hg._incidence = {
+            vertex: (edges.copy(), faces.copy())
+            for vertex, (edges, faces) in self._incidence.items()
+        }
+        # Equal members means equal tag XOR; no need to re-fold them
+        new_hg._hash = self._hash
+        # An equal state has the same canonical key, so the copy can
+        # inherit a key already computed for the original.
+        new_hg._canon_cache = self._canon_cache
         return new_hg
 
+    def with_vertex_removed(self, vertex) -> "Hypergraph":
+        """
+        Returns a new Hypergraph equal to this one minus `vertex` and its
+        incident edges/faces. The child is built directly rather than via
+        copy() + remove_vertex(), so the doomed elements are never copied
+        only to be torn down again and the parent is left untouched.
+        """
+        entry = self._incidence.get(vertex)
+        doomed_edges, doomed_faces = entry if entry is not None else (set(), set())
+
+        child = Hypergraph()
+        child.vertices = self.vertices - {vertex}
+        child.edges = self.edges - doomed_edges
+        child.faces = self.faces - doomed_faces
+        child._incidence = {
+            v: (edges - doomed_edges, faces - doomed_faces)
+            for v, (edges, faces) in self._incidence.items()
+            if v != vertex
+        }
+        # O(degree) incremental hash: parent hash minus the removed tags
+        child._hash = self._hash
+        if vertex in self.vertices:
+            child._hash ^= _vertex_tag(vertex)
+        for edge in doomed_edges:
+            child._hash ^= _edge_tag(edge)
+        for face in doomed_faces:
+            child._hash ^= _face_tag(face)
+        return child
+
+    def _refined_color_classes(self) -> list[list]:
+        """
+        Partitions the vertices into equivalence classes by iterative
+        (Weisfeiler-Lehman style) color refinement: the initial color is
+        the (edge-degree, face-degree) pair, and each round extends it with
+        the sorted colors of co-members in every incident edge and face.
+        The resulting class order is label-independent, so it can seed the
+        canonical labeling search.
+        """
+        empty_entry = (set(), set())
+
+        def normalize(raw_colors):
+            # Map the (sortable) raw color values to dense integer ranks
+            # so the tuples stay small across rounds.
+            ranks = {
+                color: i for i, color in enumerate(sorted(set(raw_colors.values())))
+            }
+            return {vertex: ranks[color] for vertex, color in raw_colors.items()}
+
+        colors = normalize(
+            {
+                vertex: (len(entry[0]), len(entry[1]))
+                for vertex, entry in (
+                    (v, self._incidence.get(v, empty_entry)) for v in self.vertices
+                )
+            }
+        )
+
+        while True:
+            raw = {}
+            for vertex in self.vertices:
+                entry = self._incidence.get(vertex, empty_entry)
+                edge_sig = sorted(
+                    tuple(sorted(colors[u] for u in edge if u != vertex))
+                    for edge in entry[0]
+                )
+                face_sig = sorted(
+                    tuple(sorted(colors[u] for u in face if u != vertex))
+                    for face in entry[1]
+                )
+                raw[vertex] = (colors[vertex], tuple(edge_sig), tuple(face_sig))
+            refined = normalize(raw)
+            if len(set(refined.values())) == len(set(colors.values())):
+                break
+            colors = refined
+
+        classes = collections.defaultdict(list)
+        for vertex, color in colors.items():
+            classes[color].append(vertex)
+        return [classes[color] for color in sorted(classes)]
+
+    def canonical_form(self):
+        """
+        Returns a canonical BitHypergraph for this hypergraph's isomorphism
+        class: two hypergraphs produce the same canonical form exactly when
+        they are isomorphic, regardless of vertex labels.
+
+        Vertices are relabeled 0..n-1; color refinement narrows the
+        candidate orderings and the lexicographically smallest (edges,
+        faces) encoding over the remaining permutations is taken. The
+        permutation search is factorial in the size of the symmetric
+        classes, so it is bounded by _CANONICAL_SEARCH_LIMIT: states
+        more symmetric than that fall back to the exact sorted-label
+        encoding, giving up orbit collapsing (isomorphic relabelings no
+        longer share a key) but never the factorial blow-up.
+        """
+        from .bithypergraph import BitHypergraph
+
+        n = len(self.vertices)
+        full_mask = (1 << n) - 1
+        # With no edges or faces every labeling encodes identically.
+        if not self.edges and not self.faces:
+            return BitHypergraph(full_mask, (), ())
+
+        classes = self._refined_color_classes()
+        orderings = 1
+        for members in classes:
+            orderings *= math.factorial(len(members))
+            if orderings > _CANONICAL_SEARCH_LIMIT:
+                return BitHypergraph.from_hypergraph(self)
+        best = None
+        for ordering in itertools.product(
+            *(itertools.permutations(members) for members in classes)
+        ):
+            bit_of = {}
+            for i, vertex in enumerate(v for group in ordering for v in group):
+                bit_of[vertex] = 1 << i
+            encoded_edges = tuple(
+                sorted(
+                    functools.reduce(int.__or__, (bit_of[v] for v in edge))
+                    for edge in self.edges
+                )
+            )
+            encoded_faces = tuple(
+                sorted(
+                    functools.reduce(int.__or__, (bit_of[v] for v in face))
+                    for face in self.faces
+                )
+            )
+            candidate = (encoded_edges, encoded_faces)
+            if best is None or candidate < best:
+                best = candidate
+        return BitHypergraph(full_mask, best[0], best[1])
+
+    def canonical_key(self) -> bytes:
+        """
+        Returns the packed bytes form of canonical_form(), memoized on
+        the instance. The Grundy and P-position memos probe this key on
+        every call, so recomputing the labeling search per probe would
+        dominate the solve; the cached key is dropped by every mutator.
+        """
+        if self._canon_cache is None:
+            self._canon_cache = self.canonical_form().pack()
+        return self._canon_cache
+
+    def to_bitstate(self):
+        """
+        Encodes this hypergraph as an immutable bitmask state.
+
+        Unlike canonical_form(), no relabeling search happens here: labels
+        get bit indices in sorted order, so the encoding is cheap and
+        deterministic but not isomorphism-invariant. This is the entry
+        point for handing a state to the integer-only Grundy kernel.
+        """
+        from .bithypergraph import BitHypergraph
+
+        return BitHypergraph.from_hypergraph(self)
+
     def get_components(self) -> list["Hypergraph"]:
         """
         Identifies and returns a list of independent (disconnected) sub-hypergraphs.
-        Uses a graph traversal (BFS) to find connected components based on shared edges/faces.
+        Connectivity is computed with a union-find over the vertices: each
+        edge/face unions its members, so a component emerges in near-linear
+        time without the O(|f|^2) pairwise adjacency expansion or the
+        per-vertex BFS bookkeeping of the previous implementation.
         """
-        components = []
-        visited_vertices = set()
+        if not self.vertices:
+            return []
 
-        # Build an adjacency list for connected vertices within the hypergraph.
-        # Vertices are connected if they share an edge or a face.
-        adj_list = collections.defaultdict(set)
+        # Union-find over the vertices: each edge/face unions all of its
+        # members with its first member, so connectivity costs one union
+        # per additional member instead of repeated mask propagation.
+        parent = {vertex: vertex for vertex in self.vertices}
 
-        # Add connections from edges
+        def find(vertex):
+            root = vertex
+            while parent[root] != root:
+                root = parent[root]
+            # Path compression
+            while parent[vertex] != root:
+                parent[vertex], vertex = root, parent[vertex]
+            return root
+
+        for group in itertools.chain(self.edges, self.faces):
+            members = iter(group)
+            first_root = find(next(members))
+            for other in members:
+                parent[find(other)] = first_root
+
+        # Partition vertices, edges, and faces by their component root in
+        # one pass each — no per-component subset scans.
+        component_vertices = collections.defaultdict(list)
+        for vertex in self.vertices:
+            component_vertices[find(vertex)].append(vertex)
+        component_edges = collections.defaultdict(list)
         for edge in self.edges:
-            # All vertices in an edge are connected to each other
-            vertices_in_edge = list(edge)
-            for i in range(len(vertices_in_edge)):
-                for j in range(i + 1, len(vertices_in_edge)):
-                    u, v = vertices_in_edge[i], vertices_in_edge[j]
-                    adj_list[u].add(v)
-                    adj_list[v].add(u)
-
-        # Add connections from faces
+            component_edges[find(next(iter(edge)))].append(edge)
+        component_faces = collections.defaultdict(list)
         for face in self.faces:
-            # All vertices in a face are connected to each other
-            vertices_in_face = list(face)
-            for i in range(len(vertices_in_face)):
-                for j in range(i + 1, len(vertices_in_face)):
-                    u, v = vertices_in_face[i], vertices_in_face[j]
-                    adj_list[u].add(v)
-                    adj_list[v].add(u)
-
-        # Perform BFS to find connected components
-        for start_vertex in self.vertices:
-            if start_vertex not in visited_vertices:
-                current_component_vertices = set()
-                queue = collections.deque([start_vertex])
-                visited_vertices.add(start_vertex)
-                current_component_vertices.add(start_vertex)
-
-                while queue:
-                    v = queue.popleft()
-                    for neighbor in adj_list[v]:
-                        if neighbor not in visited_vertices:
-                            visited_vertices.add(neighbor)
-                            current_component_vertices.add(neighbor)
-                            queue.append(neighbor)
-
-                # Create a new Hypergraph for this component
-                component_hg = Hypergraph()
-                for v in current_component_vertices:
-                    component_hg.add_vertex(v)
-
-                # Add edges and faces that are entirely within this component
-                for edge in self.edges:
-                    if edge.issubset(current_component_vertices):
-                        component_hg.add_edge(edge)
-
-                for face in self.faces:
-                    if face.issubset(current_component_vertices):
-                        component_hg.add_face(face)
-
-                components.append(component_hg)
+            component_faces[find(next(iter(face)))].append(face)
+
+        components = []
+        for root, vertices in component_vertices.items():
+            component_hg = Hypergraph.acquire()
+            for v in vertices:
+                component_hg.add_vertex(v)
+            for edge in component_edges.get(root, ()):
+                component_hg.add_edge(edge)
+            for face in component_faces.get(root, ()):
+                component_hg.add_face(face)
+            components.append(component_hg)
 
         return components
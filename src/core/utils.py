@@ -1,41 +1,155 @@
+import collections
+import concurrent.futures
+import dataclasses
 import functools  # noqa: F401
-from functools import lru_cache
+import numpy as np
+from src.core.bithypergraph import BitHypergraph, _children_fields
 from src.core.hypergraph import Hypergraph
 
 
+# Below this many values the per-element bitset loop beats building a
+# numpy array; above it the vectorized bincount wins (same trade-off as
+# _VECTOR_THRESHOLD in bithypergraph).
+_MEX_VECTOR_THRESHOLD = 64
+
+
 def calculate_mex(s: set[int]) -> int:
     """
     Calculates the Minimum Excluded (MEX) value from a set of non-negative integers.
     The MEX is the smallest non-negative integer not present in the set.
 
+    Packs the values into an int bitset and takes the lowest clear bit,
+    which replaces the previous sort-then-scan with C-level integer ops
+    (Grundy values are small, so the bitset stays within a few machine
+    words). Wide inputs — large branching factors — take a vectorized
+    numpy path instead: one bincount and one flatnonzero scan amortize
+    the per-element interpreter dispatch.
+
     Args:
         s: A set of non-negative integers.
 
     Returns:
         The MEX value.
     """
-    # Convert the set to a list and sort it to ensure ordered iteration
-    # This is robust because sets don't guarantee order.
-    sorted_s = sorted(list(s))
+    if len(s) >= _MEX_VECTOR_THRESHOLD:
+        values = np.fromiter(s, dtype=np.int64, count=len(s))
+        # Values above |s| cannot affect the MEX (|s| distinct values
+        # cover at most 0..|s|-1), so drop them to bound the bincount.
+        values = values[values <= len(s)]
+        counts = np.bincount(values, minlength=len(s) + 1)
+        return int(np.flatnonzero(counts == 0)[0])
+    bits = 0
+    for num in s:
+        bits |= 1 << num
+    # The MEX is the position of the lowest clear bit of `bits`.
+    unseen = ~bits
+    return (unseen & -unseen).bit_length() - 1
+
+
+# Shared memo for the bitmask Grundy kernel, keyed on (V, E, F) int tuples.
+_BITMASK_MEMO: dict = {}
+
+
+def _grundy_bitmask(V: int, E: tuple, F: tuple, memo: dict) -> int:
+    """
+    Integer-only Grundy kernel over a bitmask-encoded state.
+
+    Works purely on ints (vertex mask plus edge/face mask tuples) with an
+    explicit memo dict, so there is no Hypergraph hashing or set allocation
+    in the evaluation. The game DAG is walked with an explicit stack in
+    post-order (children resolved before their parent), so deep states
+    never approach the interpreter's recursion limit and there is no
+    Python frame per child. The MEX is computed inline as the lowest
+    clear bit of a bitset of reachable Grundy values.
+
+    Args:
+        V: Bitmask of the vertices still present.
+        E: Sorted tuple of edge bitmasks.
+        F: Sorted tuple of face bitmasks.
+        memo: Dict mapping (V, E, F) tuples to Grundy numbers.
+
+    Returns:
+        The Grundy number for the encoded state.
+    """
+    if V == 0:
+        return 0
+
+    root_key = (V, E, F)
+    cached = memo.get(root_key)
+    if cached is not None:
+        return cached
+
+    # Each state is visited twice: an expand pass (child_keys is None)
+    # that generates the children and re-pushes the frame behind them,
+    # and a resolve pass that folds the now-memoized child values into
+    # the MEX. Keeping the generated child keys on the frame avoids
+    # recomputing the tuple filtering on the second visit.
+    stack = [(root_key, None)]
+    while stack:
+        key, child_keys = stack.pop()
+        if child_keys is None:
+            if key in memo:
+                continue  # resolved via another parent in the meantime
+            # Sibling construction is shared with BitHypergraph.children:
+            # wide states batch the incident-mask tests into one numpy
+            # broadcast, narrow ones take a scalar loop that shares the
+            # parent's untouched tuples.
+            child_keys = _children_fields(*key)
+            stack.append((key, child_keys))
+            for child_key in child_keys:
+                if child_key[0] and child_key not in memo:
+                    stack.append((child_key, None))
+        else:
+            # Bitset of reachable Grundy values; bit g is set when some
+            # move reaches a state with Grundy number g.
+            seen = 0
+            for child_key in child_keys:
+                seen |= 1 << (memo[child_key] if child_key[0] else 0)
+            # MEX is the lowest clear bit of `seen`.
+            unseen = ~seen
+            memo[key] = (unseen & -unseen).bit_length() - 1
+    return memo[root_key]
+
+
+def calculate_grundy_bitmask(bit_hypergraph: BitHypergraph) -> int:
+    """
+    Calculates the Grundy number of a BitHypergraph state using the
+    integer-only kernel and the module-level memo.
 
-    mex = 0
-    for num in sorted_s:
-        if num == mex:
-            mex += 1
-        elif num > mex:
-            # If we encounter a number greater than mex, it means mex
-            # was missing from the set, so we've found our MEX.
-            return mex
-    return mex  # If loop completes, mex is the next number in sequence
+    Args:
+        bit_hypergraph: The bitmask-encoded hypergraph state.
+
+    Returns:
+        The Grundy number for the state.
+    """
+    return _grundy_bitmask(
+        bit_hypergraph.V, bit_hypergraph.E, bit_hypergraph.F, _BITMASK_MEMO
+    )
+
+
+# Explicit memo keyed on the packed canonical (isomorphism-class) form
+# of the state, so relabeled-but-structurally-identical positions share
+# one entry and probes hash a small bytes key instead of a nested tuple.
+# The stats dict backs a cache_info()/cache_clear() shim that keeps the
+# lru_cache-style introspection used by callers and tests.
+# The memo is capped: once full, the oldest entry is evicted (dicts keep
+# insertion order, so FIFO eviction is one del). Long analyses therefore
+# cannot grow the cache without bound; the default is generous enough
+# that eviction never triggers on the game sizes the solver handles.
+_GRUNDY_MEMO_MAXSIZE = 1 << 20
+_GRUNDY_MEMO: dict[bytes, int] = {}
+_GRUNDY_STATS = {"hits": 0, "misses": 0}
+
+_CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
 
 
-# We'll use lru_cache for memoization.
-# The `maxsize=None` makes it an unbounded cache, storing all results.
-@lru_cache(maxsize=None)
 def calculate_grundy(hypergraph: Hypergraph) -> int:
     """
     Calculates the Grundy number (nim-value) for a given hypergraph state.
-    Uses memoization to store already calculated Grundy numbers.
+    Memoized on the canonical form of the state, so all hypergraphs in the
+    same isomorphism class (not just equal ones) share a cache entry.
 
     Args:
         hypergraph: The current Hypergraph state.
@@ -43,6 +157,161 @@ def calculate_grundy(hypergraph: Hypergraph) -> int:
     Returns:
         The Grundy number for the given hypergraph state.
     """
+    # The terminal state is hit once per losing line of play; answer it
+    # without canonicalizing, packing, or touching the cache at all.
+    if not hypergraph.vertices:
+        return 0
+    key = hypergraph.canonical_key()
+    cached = _GRUNDY_MEMO.get(key)
+    if cached is not None:
+        _GRUNDY_STATS["hits"] += 1
+        return cached
+    stored = _persistent_lookup(key)
+    if stored is not None:
+        # A previous run already solved this isomorphism class.
+        _GRUNDY_STATS["hits"] += 1
+        _GRUNDY_MEMO[key] = stored
+        return stored
+    _GRUNDY_STATS["misses"] += 1
+    grundy = _calculate_grundy_uncached(hypergraph)
+    _persistent_store(key, grundy)
+    if _GRUNDY_MEMO_MAXSIZE is not None and len(_GRUNDY_MEMO) >= _GRUNDY_MEMO_MAXSIZE:
+        del _GRUNDY_MEMO[next(iter(_GRUNDY_MEMO))]
+    _GRUNDY_MEMO[key] = grundy
+    return grundy
+
+
+# Optional on-disk transposition table. Grundy numbers of canonical
+# states are universal, so entries computed in one run are valid in
+# every later one. Disabled unless enable_persistent_cache() is called.
+_PERSISTENT = {"conn": None, "pending": [], "flush_every": 256}
+
+
+def enable_persistent_cache(
+    path: str = "grundy_cache.sqlite", flush_every: int = 256
+) -> None:
+    """
+    Opens (creating if needed) an sqlite transposition table and starts
+    consulting it on memo misses. Newly computed values are buffered and
+    written back in batches of `flush_every` inside one transaction.
+
+    Args:
+        path: Location of the sqlite database file.
+        flush_every: How many new entries to buffer between flushes.
+    """
+    import sqlite3
+
+    disable_persistent_cache()
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS grundy"
+        " (canon_key BLOB PRIMARY KEY, grundy INTEGER)"
+    )
+    conn.commit()
+    _PERSISTENT["conn"] = conn
+    _PERSISTENT["flush_every"] = flush_every
+
+
+def disable_persistent_cache() -> None:
+    """
+    Flushes any buffered entries and stops consulting the on-disk table.
+    """
+    conn = _PERSISTENT["conn"]
+    if conn is None:
+        _PERSISTENT["pending"].clear()
+        return
+    _flush_persistent()
+    conn.close()
+    _PERSISTENT["conn"] = None
+
+
+def _flush_persistent() -> None:
+    """Writes the buffered entries to disk in a single transaction."""
+    conn = _PERSISTENT["conn"]
+    pending = _PERSISTENT["pending"]
+    if conn is None or not pending:
+        return
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO grundy VALUES (?, ?)", pending)
+    pending.clear()
+
+
+def _persistent_lookup(key: bytes):
+    """Returns the stored Grundy number for a canonical key, if any."""
+    conn = _PERSISTENT["conn"]
+    if conn is None:
+        return None
+    row = conn.execute(
+        "SELECT grundy FROM grundy WHERE canon_key = ?", (key,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _persistent_store(key: bytes, grundy: int) -> None:
+    """Buffers a new entry, flushing once the batch threshold is hit."""
+    if _PERSISTENT["conn"] is None:
+        return
+    _PERSISTENT["pending"].append((key, grundy))
+    if len(_PERSISTENT["pending"]) >= _PERSISTENT["flush_every"]:
+        _flush_persistent()
+
+
+def set_grundy_memo_limit(maxsize) -> None:
+    """
+    Adjusts the cap on the canonical Grundy memo.
+
+    Shrinking the cap evicts the oldest entries immediately (FIFO via
+    dict insertion order); passing None removes the bound entirely for
+    runs that are known to fit in memory.
+
+    Args:
+        maxsize: New entry cap, or None for unbounded.
+    """
+    global _GRUNDY_MEMO_MAXSIZE
+    _GRUNDY_MEMO_MAXSIZE = maxsize
+    if maxsize is not None:
+        while len(_GRUNDY_MEMO) > maxsize:
+            del _GRUNDY_MEMO[next(iter(_GRUNDY_MEMO))]
+
+
+def _grundy_cache_info():
+    return _CacheInfo(
+        _GRUNDY_STATS["hits"],
+        _GRUNDY_STATS["misses"],
+        _GRUNDY_MEMO_MAXSIZE,
+        len(_GRUNDY_MEMO),
+    )
+
+
+def _grundy_cache_clear():
+    _GRUNDY_MEMO.clear()
+    _GRUNDY_STATS["hits"] = 0
+    _GRUNDY_STATS["misses"] = 0
+
+
+calculate_grundy.cache_info = _grundy_cache_info
+calculate_grundy.cache_clear = _grundy_cache_clear
+
+
+def clear_caches() -> None:
+    """
+    Clears every module-level cache in one call: the canonical Grundy
+    memo (and its hit/miss stats), the bitmask-kernel memo, and the
+    P-position memo with its killer-move table. Useful between
+    benchmarks or when a long-running process wants its memory back.
+    calculate_grundy.cache_clear() keeps its narrower scope (the
+    Grundy memo only) for lru_cache compatibility.
+    """
+    _grundy_cache_clear()
+    _BITMASK_MEMO.clear()
+    _LOSING_MEMO.clear()
+    _KILLER_MOVES.clear()
+
+
+def _calculate_grundy_uncached(hypergraph: Hypergraph) -> int:
+    """
+    Computes the Grundy number for a state not found in the memo.
+    """
     # Base case: If the hypergraph has no possible moves (e.g., no vertices, edges, or faces)
     # its Grundy number is 0. This is the definition of a P-position (previous player wins).
     if not hypergraph.vertices:  # Assuming no vertices means no possible moves
@@ -53,35 +322,239 @@ def calculate_grundy(hypergraph: Hypergraph) -> int:
     # of its connected components
     components = hypergraph.get_components()
     if len(components) > 1:
+        # Recursively calculate for each component and XOR the results.
+        # The component objects are transient (the memo stores only
+        # ints), so each goes back to the instance pool once consumed.
         nim_sum = 0
-        for component_hg in components:
-            nim_sum ^= calculate_grundy(
-                component_hg
-            )  # Recursively calculate for each component
+        for component in components:
+            nim_sum ^= calculate_grundy(component)
+            Hypergraph.release(component)
         return nim_sum
+
+    # Single connected component that fits in one machine word: hand the
+    # state to the allocation-free bitmask kernel. The kernel recurses on
+    # plain ints (no copies, no set churn); its memo is keyed on the exact
+    # masks rather than the canonical form, which is the price of never
+    # building a Hypergraph per child.
+    if len(hypergraph.vertices) <= 64:
+        return calculate_grundy_bitmask(hypergraph.to_bitstate())
+
     # we leave the logic for a single connected component mainly if get_components returns just one
-    # Collect Grundy numbers of all reachable next states
-    reachable_grundy_numbers = set()
+    # Accumulate reachable Grundy numbers as an int bitset (bit g set
+    # when some move reaches Grundy number g) — no set to materialize,
+    # and the MEX falls out as the lowest clear bit, exactly like the
+    # bitmask kernel does it.
+    seen = 0
 
     # Consider all possible moves from the current hypergraph state
     # For Takeaway-Hypergraphs, moves involve removing a vertex
     # When a vertex is removed, any edges or faces containing it are also removed.
 
-    # Simulate removing each vertex one by one
-    for vertex_to_remove in list(
-        hypergraph.vertices
-    ):  # Iterate over a copy as set changes during iteration
-        next_hypergraph = hypergraph.copy()  # Create a copy to modify
-        next_hypergraph.remove_vertex(
-            vertex_to_remove
-        )  # This method should cascade removal
+    # Simulate removing each vertex one by one using the reversible-move
+    # protocol: mutate, recurse, restore. No Hypergraph.copy() per child —
+    # the memo is keyed on canonical snapshots, so mutating in place is
+    # safe, and each step costs only the removal delta. Moves come
+    # highest-degree first so early children are small and cache-warm.
+    for vertex_to_remove in _ordered_moves(
+        hypergraph
+    ):  # The sorted list also insulates iteration from the mutation
+        delta = hypergraph.remove_vertex(vertex_to_remove)
 
         # Recursively calculate the Grundy number for the next state
-        grundy_of_next_state = calculate_grundy(next_hypergraph)
-        reachable_grundy_numbers.add(grundy_of_next_state)
+        grundy_of_next_state = calculate_grundy(hypergraph)
+        hypergraph._restore_vertex(vertex_to_remove, *delta)
+        seen |= 1 << grundy_of_next_state
+
+    # The MEX of the reachable values is the lowest clear bit of `seen`.
+    unseen = ~seen
+    return (unseen & -unseen).bit_length() - 1
 
-    # Calculate the MEX of the reachable Grundy numbers
-    return calculate_mex(reachable_grundy_numbers)
+
+def calculate_grundy_parallel(
+    hypergraph: Hypergraph,
+    depth_cutoff: int = 2,
+    workers: int = None,
+    min_size: int = 12,
+) -> int:
+    """
+    Calculates the Grundy number using a process pool for the top of the
+    game tree, where sibling subtrees are independent and the tree is at
+    its widest.
+
+    States down to `depth_cutoff` levels are expanded in this process;
+    every state on that frontier is submitted to the pool before any
+    result is awaited, so the whole frontier evaluates concurrently with
+    the memoized sequential calculate_grundy. Each worker process keeps
+    its own memo (seeded from this process at fork, where the platform
+    forks); results are combined here by the usual MEX recurrence.
+
+    Args:
+        hypergraph: The current Hypergraph state.
+        depth_cutoff: How many levels to expand before handing subtrees
+                      to the pool.
+        workers: Pool size (None lets the executor pick).
+        min_size: Minimum vertex count before a pool is worth spawning;
+                  smaller states are answered by the sequential solver,
+                  which finishes long before worker startup would.
+
+    Returns:
+        The Grundy number for the given hypergraph state.
+    """
+    if len(hypergraph.vertices) < min_size:
+        return calculate_grundy(hypergraph)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        frontier = _submit_frontier(hypergraph, depth_cutoff, executor)
+        return _resolve_frontier(frontier)
+
+
+def _submit_frontier(hypergraph, levels_left, executor):
+    """
+    Expands the tree `levels_left` levels deep, submitting each frontier
+    state to the executor. Returns a nested structure of child lists with
+    futures (frontier states) and ints (terminal states) at the leaves.
+    """
+    if not hypergraph.vertices:
+        return 0
+    if levels_left <= 0:
+        return executor.submit(calculate_grundy, hypergraph)
+    children = []
+    # The children are built with with_vertex_removed, which never
+    # mutates this state, so iterating the live set needs no copy.
+    for vertex_to_remove in hypergraph.vertices:
+        children.append(
+            _submit_frontier(
+                hypergraph.with_vertex_removed(vertex_to_remove),
+                levels_left - 1,
+                executor,
+            )
+        )
+    return children
+
+
+def _resolve_frontier(node) -> int:
+    """
+    Collapses the structure built by _submit_frontier back into a Grundy
+    number: futures resolve to their worker's result, interior lists take
+    the MEX of their children.
+    """
+    if isinstance(node, int):
+        return node
+    if isinstance(node, list):
+        # Fold straight into an int bitset instead of allocating a set
+        # just to feed calculate_mex; the MEX is its lowest clear bit.
+        seen = 0
+        for child in node:
+            seen |= 1 << _resolve_frontier(child)
+        unseen = ~seen
+        return (unseen & -unseen).bit_length() - 1
+    return node.result()
+
+
+# Boolean P-position memo, keyed on the same packed canonical bytes as
+# _GRUNDY_MEMO so isomorphic states share entries here too.
+_LOSING_MEMO: dict[bytes, bool] = {}
+
+# Killer-move table: canonical parent key -> the vertex whose removal
+# previously reached a P-position from that parent. Trying it first
+# lets the is_losing short-circuit fire without scanning siblings.
+_KILLER_MOVES: dict[bytes, object] = {}
+
+
+def _ordered_moves(hypergraph: Hypergraph) -> list:
+    """
+    Returns the movable vertices ordered highest degree first. Removing a
+    high-degree vertex collapses the most structure, so the search lands
+    on small (and likely already-cached) child states early.
+    """
+    return sorted(hypergraph.vertices, key=hypergraph.degree, reverse=True)
+
+
+def is_losing(hypergraph: Hypergraph) -> bool:
+    """
+    Checks whether a hypergraph state is a P-position (a losing position
+    for the player to move) without computing the full Grundy number.
+
+    A state is losing exactly when no move leads to a losing state, so the
+    recursion only tracks a boolean and can stop at the first child that
+    turns out to be a P-position. This is cheaper than calculate_grundy,
+    which must evaluate every child to take the MEX. Both memos share the
+    canonical key, so any Grundy number the MEX path already computed
+    answers the P-check for free.
+
+    Args:
+        hypergraph: The current Hypergraph state.
+
+    Returns:
+        True if the state is a P-position (Grundy number 0).
+    """
+    # Base case: no moves left, the player to move has already lost.
+    if not hypergraph.vertices:
+        return True
+
+    key = hypergraph.canonical_key()
+    cached = _LOSING_MEMO.get(key)
+    if cached is not None:
+        return cached
+    grundy = _GRUNDY_MEMO.get(key)
+    if grundy is not None:
+        result = grundy == 0
+    else:
+        moves = _ordered_moves(hypergraph)
+        killer = _KILLER_MOVES.get(key)
+        if killer is not None and killer in hypergraph.vertices:
+            moves.remove(killer)
+            moves.insert(0, killer)
+        result = True
+        for vertex_to_remove in moves:
+            delta = hypergraph.remove_vertex(vertex_to_remove)
+            child_is_losing = is_losing(hypergraph)
+            hypergraph._restore_vertex(vertex_to_remove, *delta)
+            if child_is_losing:
+                # The current player can move to a P-position, so this
+                # state is winning for them; prune the remaining siblings
+                # and remember the move for isomorphic parents.
+                _KILLER_MOVES[key] = vertex_to_remove
+                result = False
+                break
+    _LOSING_MEMO[key] = result
+    return result
+
+
+_NO_MORE_MOVES = object()
+
+
+@dataclasses.dataclass(slots=True)
+class GameNode:
+    """
+    One state in a built game tree.
+
+    A slotted dataclass instead of the dict per node used previously:
+    no per-node __dict__ or key interning, and field reads are
+    attribute loads. The mapping-style accessors below keep the old
+    dict interface (node["state"], "truncated" not in node, .get())
+    working, with the absent-flag convention preserved: a flag that is
+    False behaves as if the key were missing.
+    """
+
+    state: str
+    grundy_number: int
+    children: list
+    truncated: bool = False
+    cycle_detected: bool = False
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        if key in ("truncated", "cycle_detected"):
+            return getattr(self, key)
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
 
 
 def build_game_tree(
@@ -89,93 +562,173 @@ def build_game_tree(
     max_depth: int = -1,
     current_depth: int = 0,
     _visited_states: set = None,
-) -> dict:
+) -> GameNode:
     """
-    Recursively constructs a dictionary representation of the game tree,
-    including Grundy numbers for each state.
+    Constructs the game tree as linked GameNode instances, including
+    Grundy numbers for each state.
+
+    Implemented as an explicit stack-based DFS with one shared visited
+    set: a state's key is added when its frame is pushed and discarded
+    when the frame is popped, so no per-branch set copies are made and no
+    recursion-depth cap applies to deep games. The set holds exact-state
+    tuples (Hypergraph.state_key), not 64-bit hashes, so a hash collision
+    on a deep search can never masquerade as a cycle and prune a
+    legitimate branch.
+
+    Identical subtrees are shared: a state reached along several paths
+    (with the same remaining depth budget) is expanded once and every
+    later parent references the same node, so the result is really
+    a DAG sized by the number of distinct states rather than the
+    exponential unfolded tree. Sharing is disabled when _visited_states
+    is seeded, because caller-injected cycle flags make a subtree depend
+    on the path that reached it.
 
     Args:
         hypergraph: The current hypergraph state.
         max_depth: Maximum depth to build the tree (-1 for no limit).
-        current_depth: Current recursion depth (for internal use).
-        _visited_states: Set of visited hypergraph hashes to detect cycles
-                         within the current path (for internal use, pass a copy!).
+        current_depth: Depth of the root node (useful when building a
+                       subtree of a larger exploration).
+        _visited_states: Optional set of state keys (Hypergraph
+                         .state_key tuples) already on the path leading
+                         to this subtree (they flag cycles).
 
     Returns:
-        A dictionary representing the current node in the game tree.
-    """
-    if _visited_states is None:
-        _visited_states = set()
-
-    # Create a unique, hashable representation of the current state
-    current_hg_hash = hash(hypergraph)
-
-    # 1. Depth Limit
-    if max_depth != -1 and current_depth >= max_depth:
-        return {
-            "state": str(hypergraph),
-            "grundy_number": calculate_grundy(
-                hypergraph
-            ),  # Still calculate Grundy even if truncated
-            "children": [],
-            "truncated": True,
-        }
-
-    # 2. Cycle Detection (prevents infinite recursion for cyclic games, and redundant branches)
-    if current_hg_hash in _visited_states:
-        return {
-            "state": str(hypergraph),
-            "grundy_number": calculate_grundy(
-                hypergraph
-            ),  # Get Grundy for the cycle state
-            "children": [],
-            "cycle_detected": True,
-        }
-
-    # Add current state to visited set for this path
-    _visited_states.add(current_hg_hash)
-
-    # 3. Base Case (Game End)
-    if not hypergraph.vertices:  # If the hypergraph is empty
-        return {"state": str(hypergraph), "grundy_number": 0, "children": []}
-
-    # 4. Recursive Step (Normal State)
-    grundy_number = calculate_grundy(hypergraph)
-    children_nodes = []
-
-    for vertex_to_remove in hypergraph.vertices:
-        next_hypergraph = hypergraph.copy()
-        next_hypergraph.remove_vertex(vertex_to_remove)
-
-        # Pass a COPY of _visited_states to recursive calls for independent branches
-        child_node = build_game_tree(
-            next_hypergraph,
-            max_depth=max_depth,
-            current_depth=current_depth + 1,
-            _visited_states=_visited_states.copy(),
+        The GameNode at the root of the (sub)game tree.
+    """
+    # Shared along the current DFS path; seeded from the caller's view if
+    # this call builds a subtree of a larger exploration.
+    visited = set(_visited_states) if _visited_states else set()
+    # (state_key, remaining depth) -> GameNode. States only shrink in
+    # this game, so without seeded visited states no node can be
+    # cycle-flagged and a state's subtree is path-independent; reusing
+    # the node is then safe even while it is still being filled (a
+    # repeat visit of an in-progress node would itself be a cycle).
+    shared = {} if not _visited_states else None
+
+    def budget(depth):
+        return -1 if max_depth == -1 else max_depth - depth
+
+    def make_node(hg, depth):
+        """Builds the GameNode for a state; returns (node, expandable)."""
+        # 1. Depth Limit
+        if max_depth != -1 and depth >= max_depth:
+            return (
+                GameNode(
+                    state=str(hg),
+                    # Still calculate Grundy even if truncated
+                    grundy_number=calculate_grundy(hg),
+                    children=[],
+                    truncated=True,
+                ),
+                False,
+            )
+
+        # 2. Cycle Detection (flags states already on the current path)
+        if hg.state_key() in visited:
+            return (
+                GameNode(
+                    state=str(hg),
+                    # Get Grundy for the cycle state
+                    grundy_number=calculate_grundy(hg),
+                    children=[],
+                    cycle_detected=True,
+                ),
+                False,
+            )
+
+        # 3. Base Case (Game End)
+        if not hg.vertices:  # If the hypergraph is empty
+            return GameNode(state=str(hg), grundy_number=0, children=[]), False
+
+        # 4. Expandable interior node
+        return (
+            GameNode(
+                state=str(hg),
+                grundy_number=calculate_grundy(hg),
+                children=[],
+            ),
+            True,
         )
-        children_nodes.append(child_node)
 
-    # We could remove current state from visited set for path-independent checks
-    # This is optional, but good practice for other types of tree traversal
-    # _visited_states.remove(current_hg_hash) # Not needed here as we passed a copy
+    root_node, expandable = make_node(hypergraph, current_depth)
+    if not expandable:
+        return root_node
+
+    visited.add(hypergraph.state_key())
+    if shared is not None:
+        shared[(hypergraph.state_key(), budget(current_depth))] = root_node
+    stack = [(hypergraph, current_depth, root_node, iter(hypergraph.vertices))]
+    while stack:
+        hg, depth, node, moves = stack[-1]
+        vertex_to_remove = next(moves, _NO_MORE_MOVES)
+        if vertex_to_remove is _NO_MORE_MOVES:
+            # All children generated: leave the path, unmark the state.
+            stack.pop()
+            visited.discard(hg.state_key())
+            continue
+
+        next_hypergraph = hg.with_vertex_removed(vertex_to_remove)
+        if shared is not None:
+            share_key = (next_hypergraph.state_key(), budget(depth + 1))
+            existing = shared.get(share_key)
+            if existing is not None:
+                node.children.append(existing)
+                continue
+        child_node, child_expandable = make_node(next_hypergraph, depth + 1)
+        if shared is not None:
+            shared[share_key] = child_node
+        node.children.append(child_node)
+        if child_expandable:
+            visited.add(next_hypergraph.state_key())
+            stack.append(
+                (
+                    next_hypergraph,
+                    depth + 1,
+                    child_node,
+                    iter(next_hypergraph.vertices),
+                )
+            )
+
+    return root_node
+
+
+def build_game_tree_iddfs(hypergraph: Hypergraph, max_total_depth: int) -> GameNode:
+    """
+    Builds the game tree by iterative deepening: one build_game_tree
+    pass per depth from 1 up to max_total_depth.
 
-    return {
-        "state": str(hypergraph),
-        "grundy_number": grundy_number,
-        "children": children_nodes,
-    }
+    Every pass shares the global Grundy memo, so the states a shallow
+    pass evaluates are already cached when the next pass revisits them
+    and the final (deepest) pass runs almost entirely against a warm
+    cache. The tree from that final pass is returned.
 
+    Args:
+        hypergraph: The root hypergraph state.
+        max_total_depth: Depth of the deepest (returned) pass.
 
-def print_game_tree(node: dict, indent: int = 0):
+    Returns:
+        The GameNode at the root of the game tree, as produced by
+        build_game_tree(max_depth=max_total_depth).
+    """
+    for depth in range(1, max(max_total_depth, 1)):
+        build_game_tree(hypergraph, max_depth=depth)
+    return build_game_tree(hypergraph, max_depth=max_total_depth)
+
+
+def print_game_tree(node: GameNode, indent: int = 0, _seen: set = None):
     """
-    Prints a dictionary representation of a game tree to the console
-    in a structured, indented format.
+    Prints a game tree to the console in a structured, indented format.
+
+    Subtrees shared between several parents (build_game_tree returns a
+    DAG) are walked only once; later references print a single line
+    marked (shared) instead of repeating the whole subtree.
 
     Args:
-        node: The dictionary representing the current node in the game tree.
+        node: The current GameNode in the game tree.
         indent: The current indentation level.
+        _seen: Internal set of node ids already printed.
     """
+    seen = _seen if _seen is not None else set()
     prefix = "    " * indent
     state_str = node["state"]
     grundy_num = node["grundy_number"]
@@ -190,7 +743,12 @@ def print_game_tree(node: dict, indent: int = 0):
     else:
         status = " (N-position)"
 
+    if id(node) in seen and node.get("children"):
+        print(f"{prefix}State: {state_str}, Grundy: {grundy_num}{status} (shared)")
+        return
+    seen.add(id(node))
+
     print(f"{prefix}State: {state_str}, Grundy: {grundy_num}{status}")
 
     for child in node.get("children", []):
-        print_game_tree(child, indent + 1)
+        print_game_tree(child, indent + 1, seen)
@@ -0,0 +1,128 @@
+import pytest  # noqa: F401
+from src.core.bithypergraph import BitHypergraph
+from src.core.hypergraph import Hypergraph
+
+
+def setup_hypergraph():
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_face({"b", "c", "d"})
+    return hg
+
+
+def test_from_hypergraph_encoding():
+    hg = setup_hypergraph()
+    bhg = BitHypergraph.from_hypergraph(hg)
+    # Labels are assigned bits in sorted order: a=1, b=2, c=4, d=8
+    assert bhg.V == 0b1111
+    assert bhg.E == (0b0011,)  # edge {a, b}
+    assert bhg.F == (0b1110,)  # face {b, c, d}
+
+
+def test_encoding_is_order_independent():
+    hg1 = setup_hypergraph()
+
+    hg2 = Hypergraph()
+    for v in ["d", "c", "b", "a"]:  # reverse insertion order
+        hg2.add_vertex(v)
+    hg2.add_face({"d", "c", "b"})
+    hg2.add_edge({"b", "a"})
+
+    bhg1 = BitHypergraph.from_hypergraph(hg1)
+    bhg2 = BitHypergraph.from_hypergraph(hg2)
+    assert bhg1 == bhg2
+    assert hash(bhg1) == hash(bhg2)
+
+
+def test_remove_vertex_cascades_edges_and_faces():
+    bhg = BitHypergraph.from_hypergraph(setup_hypergraph())
+    # Removing "b" (bit 1) drops both the edge and the face
+    child = bhg.remove_vertex(1)
+    assert child.V == 0b1101
+    assert child.E == ()
+    assert child.F == ()
+    # The parent state is untouched (BitHypergraph is immutable)
+    assert bhg.V == 0b1111
+    assert bhg.E == (0b0011,)
+
+
+def test_remove_vertex_keeps_unrelated_structure():
+    bhg = BitHypergraph.from_hypergraph(setup_hypergraph())
+    # Removing "a" (bit 0) drops the edge but keeps the face {b, c, d}
+    child = bhg.remove_vertex(0)
+    assert child.V == 0b1110
+    assert child.E == ()
+    assert child.F == (0b1110,)
+
+
+def test_vertex_bits_and_emptiness():
+    bhg = BitHypergraph.from_hypergraph(setup_hypergraph())
+    assert sorted(bhg.vertex_bits()) == [0, 1, 2, 3]
+    assert bhg.vertex_count() == 4
+    assert not bhg.is_empty()
+
+    state = bhg
+    for bit in [0, 1, 2, 3]:
+        state = state.remove_vertex(bit)
+    assert state.is_empty()
+    assert state.vertex_count() == 0
+    assert list(state.vertex_bits()) == []
+
+
+def test_pack_is_stable_and_collision_free():
+    hg1 = setup_hypergraph()
+    bhg1 = BitHypergraph.from_hypergraph(hg1)
+    # Equal states pack to the same bytes
+    assert bhg1.pack() == BitHypergraph.from_hypergraph(hg1).pack()
+
+    # Dropping a vertex, an edge, or a face each changes the key
+    keys = {bhg1.pack()}
+    keys.add(bhg1.remove_vertex(0).pack())
+    keys.add(BitHypergraph(bhg1.V, (), bhg1.F).pack())
+    keys.add(BitHypergraph(bhg1.V, bhg1.E, ()).pack())
+    assert len(keys) == 4
+
+    # Edge/face boundary is unambiguous: one mask as an edge vs as a face
+    assert (
+        BitHypergraph(0b111, (0b011,), ()).pack()
+        != BitHypergraph(0b111, (), (0b011,)).pack()
+    )
+
+
+def test_filter_masks_vectorized_path_matches_scalar():
+    from src.core.bithypergraph import _filter_masks, _VECTOR_THRESHOLD
+
+    # Enough masks to cross the vectorized threshold
+    masks = tuple(sorted((1 << (i % 10)) | (1 << ((i * 7) % 10)) for i in range(100)))
+    assert len(masks) >= _VECTOR_THRESHOLD
+    bit = 1 << 3
+    expected = tuple(m for m in masks if not m & bit)
+    assert _filter_masks(masks, bit) == expected
+    # Small containers take the scalar path and agree too
+    assert _filter_masks(masks[:5], bit) == tuple(m for m in masks[:5] if not m & bit)
+
+
+def test_children_matches_per_vertex_removal():
+    import random
+
+    # Small state takes the scalar path
+    bhg = BitHypergraph.from_hypergraph(setup_hypergraph())
+    expected = [bhg.remove_vertex(i) for i in bhg.vertex_bits()]
+    assert bhg.children() == expected
+
+    # Wide state crosses the batched numpy path
+    rng = random.Random(7)
+    n = 12
+    edges = set()
+    while len(edges) < 50:
+        i, j = rng.sample(range(n), 2)
+        edges.add((1 << i) | (1 << j))
+    faces = set()
+    while len(faces) < 20:
+        i, j, k = rng.sample(range(n), 3)
+        faces.add((1 << i) | (1 << j) | (1 << k))
+    wide = BitHypergraph((1 << n) - 1, tuple(sorted(edges)), tuple(sorted(faces)))
+    expected = [wide.remove_vertex(i) for i in wide.vertex_bits()]
+    assert wide.children() == expected
@@ -59,6 +59,30 @@ def test_removal_of_vertex_cascades_edges_and_faces():
     assert frozenset(face) not in hg.faces
 
 
+def test_remove_vertex_returns_delta():
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_edge({"c", "d"})
+    hg.add_face({"b", "c", "d"})
+
+    removed_edges, removed_faces = hg.remove_vertex("b")
+    assert removed_edges == {frozenset({"a", "b"})}
+    assert removed_faces == {frozenset({"b", "c", "d"})}
+    # Surviving structure is untouched
+    assert frozenset({"c", "d"}) in hg.edges
+
+    # The delta is enough to reconstruct the previous state
+    hg._restore_vertex("b", removed_edges, removed_faces)
+    assert "b" in hg.vertices
+    assert frozenset({"a", "b"}) in hg.edges
+    assert frozenset({"b", "c", "d"}) in hg.faces
+
+    # Removing a missing vertex is a no-op with an empty delta
+    assert hg.remove_vertex("z") == (set(), set())
+
+
 def test_repr_for_debugging():
     hg = Hypergraph()
     hg.add_vertex("x")
@@ -309,11 +333,245 @@ def test_hypergraph_get_components_complex_disconnected():
     expected_comp3 = Hypergraph()
     expected_comp3.add_vertex("p")
 
-    actual_components_set = {str(c) for c in components}  # Use str for set comparison
-    expected_components_set = {
-        str(expected_comp1),
-        str(expected_comp2),
-        str(expected_comp3),
-    }
+    # Compare structurally (set iteration order makes str() unstable)
+    assert expected_comp1 in components
+    assert expected_comp2 in components
+    assert expected_comp3 in components
+
+
+def test_incidence_index_stays_consistent():
+    """The vertex->incident elements index must track every mutator."""
+
+    def assert_index_matches(hg):
+        for vertex in hg.vertices:
+            edges, faces = hg._incidence.get(vertex, (set(), set()))
+            assert edges == {e for e in hg.edges if vertex in e}
+            assert faces == {f for f in hg.faces if vertex in f}
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_edge({"b", "c"})
+    hg.add_face({"b", "c", "d"})
+    assert_index_matches(hg)
+
+    delta = hg.remove_vertex("b")
+    assert_index_matches(hg)
+
+    hg._restore_vertex("b", *delta)
+    assert_index_matches(hg)
+
+    hg.remove_edge({"a", "b"})
+    assert_index_matches(hg)
+
+    hg.remove_face({"b", "c", "d"})
+    assert_index_matches(hg)
+
+    # A copy must not share index entries with the original
+    hg2 = hg.copy()
+    hg2.remove_vertex("c")
+    assert_index_matches(hg2)
+    assert_index_matches(hg)
+
+
+def test_canonical_form_collapses_isomorphic_states():
+    """Relabeled copies of the same structure share a canonical form."""
+    hg1 = Hypergraph()
+    hg1.add_vertex("a")
+    hg1.add_vertex("b")
+    hg1.add_edge({"a", "b"})
+
+    hg2 = Hypergraph()
+    hg2.add_vertex("x")
+    hg2.add_vertex("y")
+    hg2.add_edge({"x", "y"})
+
+    assert hg1 != hg2  # different labels
+    assert hg1.canonical_form() == hg2.canonical_form()
+
+
+def test_canonical_form_distinguishes_structure():
+    # Edge {a, b} plus isolated c ...
+    hg1 = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg1.add_vertex(v)
+    hg1.add_edge({"a", "b"})
+
+    # ... versus a path a-b-c on the same vertex count
+    hg2 = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg2.add_vertex(v)
+    hg2.add_edge({"a", "b"})
+    hg2.add_edge({"b", "c"})
+
+    assert hg1.canonical_form() != hg2.canonical_form()
+
+    # A face is not the same structure as its skeleton of edges
+    hg3 = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg3.add_vertex(v)
+    hg3.add_face({"a", "b", "c"})
+    assert hg2.canonical_form() != hg3.canonical_form()
+
+
+def test_canonical_form_is_label_order_independent():
+    """The same structure built in any insertion order canonicalizes equally."""
+    hg1 = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg1.add_vertex(v)
+    hg1.add_edge({"a", "b"})
+    hg1.add_face({"b", "c", "d"})
+
+    hg2 = Hypergraph()
+    for v in ["d", "c", "b", "a"]:
+        hg2.add_vertex(v)
+    hg2.add_face({"c", "d", "b"})
+    hg2.add_edge({"b", "a"})
+
+    assert hg1.canonical_form() == hg2.canonical_form()
+
+
+def test_vertex_degree():
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_face({"b", "c", "d"})
+    assert hg.degree("b") == 2
+    assert hg.degree("a") == 1
+    assert hg.degree("d") == 1
+    hg.remove_edge({"a", "b"})
+    assert hg.degree("a") == 0
+    assert hg.degree("missing") == 0
+
+
+def test_with_vertex_removed_matches_copy_and_remove():
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_edge({"c", "d"})
+    hg.add_face({"b", "c", "d"})
+
+    expected = hg.copy()
+    expected.remove_vertex("b")
+    child = hg.with_vertex_removed("b")
+
+    assert child.vertices == expected.vertices
+    assert child.edges == expected.edges
+    assert child.faces == expected.faces
+    assert hash(child) == hash(expected)
+    # The parent state must be untouched
+    assert "b" in hg.vertices
+    assert frozenset({"a", "b"}) in hg.edges
+    # The child is independently mutable (its incidence index is its own)
+    child.remove_vertex("c")
+    assert frozenset({"c", "d"}) in hg.edges
+    assert hg.degree("d") == 2
+
+
+def test_acquire_reuses_released_instances():
+    hg = Hypergraph()
+    for v in ["a", "b"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+
+    Hypergraph.release(hg)
+    recycled = Hypergraph.acquire()
+    # The released instance comes back cleared and ready for reuse
+    assert recycled is hg
+    assert recycled.vertices == set()
+    assert recycled.edges == set()
+    assert recycled.faces == set()
+    recycled.add_vertex("x")
+    assert recycled.vertices == {"x"}
+
+
+def test_incremental_hash_matches_structural_rebuild():
+    """The Zobrist hash kept by the mutators must always equal the hash
+    of an identical state built from scratch."""
+
+    def rebuilt(hg):
+        fresh = Hypergraph()
+        for v in hg.vertices:
+            fresh.add_vertex(v)
+        for e in hg.edges:
+            fresh.add_edge(e)
+        for f in hg.faces:
+            fresh.add_face(f)
+        return fresh
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_face({"b", "c", "d"})
+    assert hash(hg) == hash(rebuilt(hg))
+
+    # Through a remove/restore round trip
+    delta = hg.remove_vertex("b")
+    assert hash(hg) == hash(rebuilt(hg))
+    hg._restore_vertex("b", *delta)
+    assert hash(hg) == hash(rebuilt(hg))
+
+    # Through hyperedge removal and duplicate adds (which are no-ops)
+    hg.remove_hyperedge({"b", "c", "d"})
+    hg.add_edge({"a", "b"})
+    assert hash(hg) == hash(rebuilt(hg))
+
+
+def test_str_is_cached_and_invalidated_by_mutation():
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+
+    # Repeated renders return the memoized string object
+    first = str(hg)
+    assert str(hg) is first
+
+    # Every mutator drops the cache so the next render is current
+    hg.add_face({"a", "b", "c"})
+    assert "frozenset" in str(hg) and str(hg) != first
+
+    delta = hg.remove_vertex("b")
+    after_removal = str(hg)
+    assert "'b'" not in after_removal.split("|")[0]
+    hg._restore_vertex("b", *delta)
+    assert str(hg) != after_removal
+    assert str(hg) is str(hg)
+
+
+def test_canonical_form_bounds_symmetric_search():
+    """A highly symmetric state (single large face: one color class, so
+    |V|! candidate orderings) must fall back to the exact sorted-label
+    encoding instead of enumerating permutations."""
+    import time
+
+    hg = Hypergraph()
+    for i in range(12):
+        hg.add_vertex(f"v{i:02d}")
+    hg.add_face(set(hg.vertices))
+
+    start = time.perf_counter()
+    canonical = hg.canonical_form()
+    assert time.perf_counter() - start < 1.0
+    assert canonical == hg.to_bitstate()
+
+
+def test_canonical_key_is_cached_and_invalidated():
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+
+    key = hg.canonical_key()
+    # Repeated probes return the memoized key object
+    assert hg.canonical_key() is key
 
-    assert actual_components_set == expected_components_set
+    # Mutation drops the cache; undoing the move restores the old key
+    delta = hg.remove_vertex("c")
+    assert hg.canonical_key() != key
+    hg._restore_vertex("c", *delta)
+    assert hg.canonical_key() == key
@@ -118,3 +118,13 @@ def test_game_grundy_hypergraph_with_one_face():
     assert game.get_current_grundy_number() == 1
     assert game.is_losing_position() is False
     assert game.is_winning_position() is True
+
+
+def test_undo_hyperedge_move():
+    hg = setup_hypergraph()
+    game = TakeAwayGame(hg)
+    game.move_hyperedge(["b", "c"])
+    assert frozenset({"b", "c"}) not in game.hypergraph.faces
+    game.undo()
+    assert frozenset({"b", "c"}) in game.hypergraph.faces
+    assert game.current_player == "Player 1"
@@ -1,7 +1,9 @@
 import pytest
+from src.core.bithypergraph import BitHypergraph
 from src.core.utils import (
     calculate_mex,
     calculate_grundy,
+    calculate_grundy_bitmask,
     build_game_tree,
     print_game_tree,
 )
@@ -130,13 +132,15 @@ def test_grundy_memoization():
 
     grundy_val_1 = calculate_grundy(hg1)
     assert (
-        calculate_grundy.cache_info().misses == 4
-    )  # Initial hg1, and its two successors ({"a"}, {"b"})
+        calculate_grundy.cache_info().misses == 2
+    )  # hg1 and the single-vertex class ({"a"} and {"b"} are isomorphic,
+    # so they share one canonical entry). The empty state is resolved
+    # inside the bitmask kernel and never reaches this cache.
 
     grundy_val_2 = calculate_grundy(hg2)
-    # hg2 is identical to hg1 (due to __eq__ and __hash__), so it should be a cache hit.
-    # Its children ({"a"}, {"b"}) should also be cache hits.
-    assert calculate_grundy.cache_info().hits == 2  # hg2 itself, plus its children
+    # hg2 is isomorphic (indeed identical) to hg1, so it is a cache hit,
+    # on top of the hit {"b"} scored on {"a"}'s canonical entry above.
+    assert calculate_grundy.cache_info().hits == 2
 
     assert (
         grundy_val_1 == grundy_val_2 == 0
@@ -322,3 +326,410 @@ def test_calculate_grundy_disconnected_complex_example():
     hg.add_vertex("p")  # Component 3: G=1
 
     assert calculate_grundy(hg) == 0
+
+
+def test_grundy_bitmask_matches_hypergraph_grundy():
+    """The integer kernel must agree with calculate_grundy on small states."""
+    cases = []
+
+    hg_empty = Hypergraph()
+    cases.append(hg_empty)
+
+    hg_single = Hypergraph()
+    hg_single.add_vertex("a")
+    cases.append(hg_single)
+
+    hg_edge = Hypergraph()
+    hg_edge.add_vertex("a")
+    hg_edge.add_vertex("b")
+    hg_edge.add_edge({"a", "b"})
+    cases.append(hg_edge)
+
+    hg_face = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg_face.add_vertex(v)
+    hg_face.add_face({"a", "b", "c"})
+    cases.append(hg_face)
+
+    hg_mixed = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg_mixed.add_vertex(v)
+    hg_mixed.add_edge({"a", "b"})
+    hg_mixed.add_face({"b", "c", "d"})
+    cases.append(hg_mixed)
+
+    for hg in cases:
+        bhg = BitHypergraph.from_hypergraph(hg)
+        assert calculate_grundy_bitmask(bhg) == calculate_grundy(hg)
+
+
+def test_is_losing_agrees_with_grundy():
+    """is_losing must match calculate_grundy(hg) == 0 on standard cases."""
+    from src.core.utils import is_losing
+
+    hg_empty = Hypergraph()
+
+    hg_single = Hypergraph()
+    hg_single.add_vertex("a")
+
+    hg_pair = Hypergraph()
+    hg_pair.add_vertex("a")
+    hg_pair.add_vertex("b")
+
+    hg_face = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg_face.add_vertex(v)
+    hg_face.add_face({"a", "b", "c"})
+
+    for hg in [hg_empty, hg_single, hg_pair, hg_face]:
+        assert is_losing(hg) == (calculate_grundy(hg) == 0)
+
+
+def test_grundy_of_disjoint_union_is_xor_of_parts():
+    """Sprague-Grundy: the Grundy number of a disconnected hypergraph is
+    the XOR of its components' Grundy numbers."""
+    part_a = Hypergraph()
+    for v in ["a", "b", "c"]:
+        part_a.add_vertex(v)
+    part_a.add_face({"a", "b", "c"})
+
+    part_b = Hypergraph()
+    part_b.add_vertex("x")
+    part_b.add_vertex("y")
+    part_b.add_edge({"x", "y"})
+
+    union = Hypergraph()
+    for v in ["a", "b", "c", "x", "y"]:
+        union.add_vertex(v)
+    union.add_face({"a", "b", "c"})
+    union.add_edge({"x", "y"})
+
+    assert calculate_grundy(union) == (
+        calculate_grundy(part_a) ^ calculate_grundy(part_b)
+    )
+
+
+def test_build_game_tree_is_iterative_beyond_recursion_frames():
+    """The stack-based DFS must reach depths a recursive implementation
+    could not, so we build a single deep chain under a tightened recursion
+    limit and check it bottoms out."""
+    import sys
+
+    n = 200
+    hg = Hypergraph()
+    for i in range(n):
+        hg.add_vertex(i)
+
+    # A full tree over n isolated vertices is exponential, so prune it to
+    # one chain: pre-seed _visited_states with the state keys of every
+    # child that does NOT remove the smallest remaining vertex. Those
+    # siblings are then flagged as cycles and stay terminal, leaving
+    # exactly one expandable child per level — a chain of depth n.
+    pruned_keys = set()
+    chain_state = hg.copy()
+    for _ in range(n):
+        remaining = sorted(chain_state.vertices)
+        for off_chain in remaining[1:]:
+            sibling = chain_state.copy()
+            sibling.remove_vertex(off_chain)
+            pruned_keys.add(sibling.state_key())
+        chain_state.remove_vertex(remaining[0])
+
+    # Leave far fewer spare frames than the chain is deep: a recursive
+    # traversal (at least one frame per level) would blow up here.
+    frames = 0
+    frame = sys._getframe()
+    while frame is not None:
+        frames += 1
+        frame = frame.f_back
+    margin = 80
+    assert n > margin
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(frames + margin)
+    try:
+        tree = build_game_tree(hg, _visited_states=pruned_keys)
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    # Every level keeps one expandable child; the rest are cycle-flagged.
+    assert len(tree["children"]) == n
+    assert sum(1 for c in tree["children"] if c.get("cycle_detected")) == n - 1
+
+    depth = 0
+    node = tree
+    while node["children"]:
+        expandable = [c for c in node["children"] if not c.get("cycle_detected")]
+        assert len(expandable) == 1
+        node = expandable[0]
+        depth += 1
+    assert depth == n
+
+
+def test_grundy_memo_is_shared_across_isomorphic_states():
+    """Relabeled-but-isomorphic states must collapse onto one memo entry:
+    the second state is a pure cache hit, not a recomputation."""
+    calculate_grundy.cache_clear()
+
+    hg1 = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg1.add_vertex(v)
+    hg1.add_edge({"a", "b"})
+
+    grundy_1 = calculate_grundy(hg1)
+    misses_after_first = calculate_grundy.cache_info().misses
+
+    # Same structure under completely different labels
+    hg2 = Hypergraph()
+    for v in ["x", "y", "z"]:
+        hg2.add_vertex(v)
+    hg2.add_edge({"y", "z"})
+
+    grundy_2 = calculate_grundy(hg2)
+    info = calculate_grundy.cache_info()
+
+    assert grundy_1 == grundy_2
+    # No new misses: the isomorphic state resolved through the canonical key
+    assert info.misses == misses_after_first
+    assert info.hits >= 1
+
+
+def test_calculate_grundy_parallel_matches_sequential():
+    """The pool-based evaluator must agree with the sequential one."""
+    from src.core.utils import calculate_grundy_parallel
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c", "d"]:
+        hg.add_vertex(v)
+    hg.add_edge({"a", "b"})
+    hg.add_face({"b", "c", "d"})
+
+    expected = calculate_grundy(hg)
+    # min_size=0 forces the pool path even on this small state
+    assert (
+        calculate_grundy_parallel(hg, depth_cutoff=1, workers=2, min_size=0) == expected
+    )
+    # Cutoff past the tree depth degenerates to in-process evaluation
+    assert (
+        calculate_grundy_parallel(hg, depth_cutoff=10, workers=2, min_size=0)
+        == expected
+    )
+    assert calculate_grundy_parallel(Hypergraph(), workers=2) == 0
+
+
+def test_calculate_grundy_parallel_gates_small_states():
+    """Below min_size no pool is spawned; the sequential solver answers
+    directly (observable through the memo miss counter)."""
+    from src.core.utils import calculate_grundy_parallel
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_face({"a", "b", "c"})
+
+    calculate_grundy.cache_clear()
+    assert calculate_grundy_parallel(hg, workers=2) == calculate_grundy(hg)
+    # The gated call went through the memoizing sequential path, so the
+    # second call above was a pure cache hit.
+    assert calculate_grundy.cache_info().hits >= 1
+
+
+def test_is_losing_reuses_grundy_memo_entries():
+    """A Grundy number computed by the MEX path must answer the
+    P-position check without re-expanding the state."""
+    from src.core.utils import _LOSING_MEMO, is_losing
+
+    calculate_grundy.cache_clear()
+    _LOSING_MEMO.clear()
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_face({"a", "b", "c"})
+
+    grundy = calculate_grundy(hg)
+    key = hg.canonical_form().pack()
+    assert key not in _LOSING_MEMO
+    assert is_losing(hg) == (grundy == 0)
+    # The answer came straight from the shared canonical entry
+    assert _LOSING_MEMO[key] == (grundy == 0)
+
+
+def test_set_grundy_memo_limit_caps_and_evicts():
+    """Shrinking the memo cap evicts oldest entries; raising it restores
+    headroom for new ones."""
+    from src.core.utils import _GRUNDY_MEMO, set_grundy_memo_limit
+
+    calculate_grundy.cache_clear()
+    try:
+        # Populate a few entries (distinct isomorphism classes)
+        for size in range(1, 5):
+            hg = Hypergraph()
+            for i in range(size):
+                hg.add_vertex(i)
+            hg.add_edge({0, 1}) if size >= 2 else None
+            calculate_grundy(hg)
+        assert len(_GRUNDY_MEMO) >= 3
+
+        set_grundy_memo_limit(2)
+        assert len(_GRUNDY_MEMO) == 2
+        assert calculate_grundy.cache_info().maxsize == 2
+
+        # New entries keep respecting the cap
+        hg = Hypergraph()
+        for v in ["p", "q", "r"]:
+            hg.add_vertex(v)
+        hg.add_face({"p", "q", "r"})
+        calculate_grundy(hg)
+        assert len(_GRUNDY_MEMO) <= 2
+    finally:
+        set_grundy_memo_limit(1 << 20)
+        calculate_grundy.cache_clear()
+
+
+def test_persistent_cache_survives_memory_clear(tmp_path):
+    """Values flushed to the sqlite table must answer later runs after
+    the in-memory memo is gone."""
+    from src.core.utils import (
+        disable_persistent_cache,
+        enable_persistent_cache,
+    )
+
+    db = str(tmp_path / "grundy_cache.sqlite")
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_face({"a", "b", "c"})
+
+    calculate_grundy.cache_clear()
+    enable_persistent_cache(db, flush_every=1)
+    try:
+        expected = calculate_grundy(hg)
+
+        # Simulate a process restart: drop all in-memory state
+        calculate_grundy.cache_clear()
+        misses_before = calculate_grundy.cache_info().misses
+        assert calculate_grundy(hg) == expected
+        # The answer came from disk, so no new top-level miss
+        assert calculate_grundy.cache_info().misses == misses_before
+        assert calculate_grundy.cache_info().hits >= 1
+    finally:
+        disable_persistent_cache()
+        calculate_grundy.cache_clear()
+
+
+def test_mex_vectorized_path_matches_scalar():
+    """Wide inputs cross the numpy threshold and must agree with the
+    bitset path."""
+    from src.core.utils import _MEX_VECTOR_THRESHOLD
+
+    wide = set(range(_MEX_VECTOR_THRESHOLD + 20))
+    assert calculate_mex(wide) == len(wide)
+
+    gap = 17
+    wide_with_gap = wide - {gap}
+    assert len(wide_with_gap) >= _MEX_VECTOR_THRESHOLD
+    assert calculate_mex(wide_with_gap) == gap
+
+    # Oversized values are irrelevant to the MEX and must not blow up
+    wide_with_outlier = (wide - {3}) | {10**9}
+    assert calculate_mex(wide_with_outlier) == 3
+
+
+def test_build_game_tree_iddfs_matches_direct_build():
+    """Iterative deepening must return the same tree as a direct build
+    at the final depth."""
+    from src.core.utils import build_game_tree_iddfs
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_face({"a", "b", "c"})
+
+    assert build_game_tree_iddfs(hg, 2) == build_game_tree(hg, max_depth=2)
+    # A depth beyond the game's end is equivalent to the full tree
+    assert build_game_tree_iddfs(hg, 10) == build_game_tree(hg, max_depth=10)
+
+
+def test_build_game_tree_shares_identical_subtrees():
+    """States reached along several paths must be expanded once: both
+    orders of removing {a, b} funnel into the same empty-graph node."""
+    hg = Hypergraph()
+    hg.add_vertex("a")
+    hg.add_vertex("b")
+    tree = build_game_tree(hg)
+
+    grandchildren = [
+        grandchild for child in tree["children"] for grandchild in child["children"]
+    ]
+    assert len(grandchildren) == 2
+    # Same object, not merely equal dicts
+    assert grandchildren[0] is grandchildren[1]
+
+
+def test_bitmask_kernel_runs_within_constant_stack_depth():
+    """The bitmask kernel walks the game DAG iteratively, so solving a
+    state 16 moves deep must not consume 16 Python frames."""
+    import sys
+
+    from src.core.bithypergraph import BitHypergraph
+    from src.core.utils import _grundy_bitmask
+
+    frames = 0
+    frame = sys._getframe()
+    while frame is not None:
+        frames += 1
+        frame = frame.f_back
+
+    # 16 isolated vertices: the deepest line of play removes them one by
+    # one, which a recursive kernel would turn into 16 nested frames.
+    bhg = BitHypergraph((1 << 16) - 1, (), ())
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(frames + 10)
+    try:
+        grundy = _grundy_bitmask(bhg.V, bhg.E, bhg.F, {})
+    finally:
+        sys.setrecursionlimit(limit)
+    # 16 heaps of one token each: nim-sum is 0
+    assert grundy == 0
+
+
+def test_clear_caches_empties_every_module_cache():
+    from src.core import utils
+    from src.core.utils import clear_caches, is_losing
+
+    hg = Hypergraph()
+    for v in ["a", "b", "c"]:
+        hg.add_vertex(v)
+    hg.add_face({"a", "b", "c"})
+    calculate_grundy(hg)
+    is_losing(hg)
+    assert utils._GRUNDY_MEMO and utils._BITMASK_MEMO and utils._LOSING_MEMO
+
+    clear_caches()
+    assert not utils._GRUNDY_MEMO
+    assert not utils._BITMASK_MEMO
+    assert not utils._LOSING_MEMO
+    assert not utils._KILLER_MOVES
+    assert calculate_grundy.cache_info().currsize == 0
+    assert calculate_grundy.cache_info().hits == 0
+
+
+def test_game_tree_nodes_are_slotted_with_dict_compat():
+    """Tree nodes are slotted GameNode instances but still answer the
+    dict-style accesses older callers use."""
+    from src.core.utils import GameNode
+
+    hg = Hypergraph()
+    hg.add_vertex("a")
+    tree = build_game_tree(hg)
+
+    assert isinstance(tree, GameNode)
+    assert not hasattr(tree, "__dict__")  # slots only
+    assert tree["grundy_number"] == 1
+    assert tree.children[0].state == tree["children"][0]["state"]
+    # Flag lookups keep the old missing-key convention: a False flag
+    # behaves as an absent key
+    assert "truncated" not in tree.children[0]
+    assert tree.get("cycle_detected") is False
+    with pytest.raises(KeyError):
+        tree["no_such_field"]